@@ -1,18 +1,18 @@
 from __future__ import division
 import numpy as np
-from congestion_approx import CongestionApprox
+from congestion_approx import CongestionApprox, scale_rows
 
 class ConductanceCongestionApprox(CongestionApprox):
     def __init__(self, g):
-        self.vertex_degrees_inv = [
+        self.vertex_degrees_inv = np.array([
             1.0 / g.degree(v) if g.degree(v) > 0 else 0 for v in g.nodes()
-        ]
+        ])
 
     def compute_dot(self, x):
-        return np.multiply(x, self.vertex_degrees_inv)
+        return scale_rows(x, self.vertex_degrees_inv)
 
     def compute_transpose_dot(self, x):
-        return np.multiply(x, self.vertex_degrees_inv)
+        return scale_rows(x, self.vertex_degrees_inv)
 
     def alpha(self):
         # TODO: this probably isn't quite right.
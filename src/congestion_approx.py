@@ -1,3 +1,15 @@
+import numpy as np
+
+
+def scale_rows(x, scale):
+    # Multiply each row of x by the matching entry of scale. x is either a
+    # single vector or a 2-D array whose columns are a batch of vectors.
+    scale = np.asarray(scale)
+    if np.ndim(x) == 2:
+        scale = scale[:, np.newaxis]
+    return np.multiply(x, scale)
+
+
 class CongestionApprox:
     # A congestion approximator represents (abstractly) a matrix R such that:
     # ||Rb||_inf <= opt(b) <= alpha ||Rb||_inf
@@ -12,6 +24,9 @@ class CongestionApprox:
         # The result is a vector in some subset of the edge-space of g, with arbitrary
         # ordering except that the order should be consistent with the input of
         # compute_transpose_dot
+        #
+        # x may also be a 2-D array whose columns are separate node vectors, in
+        # which case the result has one column per input column.
         return None
 
     def compute_transpose_dot(self, x):
@@ -1,5 +1,6 @@
 from __future__ import division
 import networkx as nx
+import numpy as np
 import random
 
 EDGE_CAPACITY_ATTR = 'capacity'
@@ -40,6 +41,32 @@ def edge_iter(g):
         for neighbor, _ in neighbor_dict.items():
             yield (n, neighbor)
 
+def edge_index_arrays(g):
+    # Source and target node arrays, in the same order as edge_iter(g).
+    m = g.number_of_edges()
+    edge_from = np.empty(m, dtype=np.intp)
+    edge_to = np.empty(m, dtype=np.intp)
+    for i, (u, v) in enumerate(edge_iter(g)):
+        edge_from[i] = u
+        edge_to[i] = v
+    return edge_from, edge_to
+
+def sweep_cuts(values, edge_from, edge_to, capacities):
+    # Threshold cuts of a node ordering: with order = argsort(values), cut j
+    # separates S_j = order[:j + 1] from the rest, for j = 0 .. n - 2. Returns
+    # order and the (undirected) capacity crossing each cut, computed with a
+    # difference array instead of one pass per threshold.
+    n = len(values)
+    order = np.argsort(values, kind='stable')
+    rank = np.empty(n, dtype=np.intp)
+    rank[order] = np.arange(n)
+    lo = np.minimum(rank[edge_from], rank[edge_to])
+    hi = np.maximum(rank[edge_from], rank[edge_to])
+    # An edge crosses cut j exactly when lo <= j < hi.
+    diff = (np.bincount(lo, weights=capacities, minlength=n) -
+            np.bincount(hi, weights=capacities, minlength=n))
+    return order, np.cumsum(diff)[:-1]
+
 def capacity_edge_iter(g):
     for n, neighbor_dict in g.adjacency():
         for neighbor, edge_data in neighbor_dict.items():
@@ -118,9 +145,9 @@ def gen_rand_2d_mesh(width, height):
             x_nbr_id = j * width + (i + 1)
             y_nbr_id = (j + 1) * width + i
             if i < width - 1:
-                g.add_edge(cur_id, x_nbr_id, {EDGE_CAPACITY_ATTR: random.random()})
+                g.add_edge(cur_id, x_nbr_id, **{EDGE_CAPACITY_ATTR: random.random()})
             if j < height - 1:
-                g.add_edge(cur_id, y_nbr_id, {EDGE_CAPACITY_ATTR: random.random()})
+                g.add_edge(cur_id, y_nbr_id, **{EDGE_CAPACITY_ATTR: random.random()})
     return g
 
 def gen_rand_3d_mesh(width, height, depth):
@@ -133,11 +160,11 @@ def gen_rand_3d_mesh(width, height, depth):
                 y_nbr_id = k * width * height + (j + 1) * width + i
                 z_nbr_id = (k + 1) * width * height + j * width + i
                 if i < width - 1:
-                    g.add_edge(cur_id, x_nbr_id, {EDGE_CAPACITY_ATTR: random.random()})
+                    g.add_edge(cur_id, x_nbr_id, **{EDGE_CAPACITY_ATTR: random.random()})
                 if j < height - 1:
-                    g.add_edge(cur_id, y_nbr_id, {EDGE_CAPACITY_ATTR: random.random()})
+                    g.add_edge(cur_id, y_nbr_id, **{EDGE_CAPACITY_ATTR: random.random()})
                 if k < depth - 1:
-                    g.add_edge(cur_id, z_nbr_id, {EDGE_CAPACITY_ATTR: random.random()})
+                    g.add_edge(cur_id, z_nbr_id, **{EDGE_CAPACITY_ATTR: random.random()})
     return g
 
 def cut_from_residuals(resid_g, source_vert):
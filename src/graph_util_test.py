@@ -2,6 +2,8 @@ from __future__ import division
 import graph_util
 from graph_util import EDGE_CAPACITY_ATTR
 import networkx
+import numpy as np
+import random
 import unittest
 
 
@@ -44,6 +46,20 @@ class GraphUtilTest(unittest.TestCase):
                 self.assertIn(u1, range(g.number_of_nodes()))
                 self.assertIn(v1, range(g.number_of_nodes()))
 
+    def test_sweep_cuts(self):
+        g = graph_util.diluted_complete_graph(15, 0.5)
+        for e in g.edges():
+            graph_util.set_edge_capacity(g, e, random.random())
+        edge_from, edge_to = graph_util.edge_index_arrays(g)
+        capacities = np.array(graph_util.get_edge_capacities(g))
+        values = np.random.normal(size=g.number_of_nodes())
+
+        order, cut_capacities = graph_util.sweep_cuts(values, edge_from, edge_to, capacities)
+        self.assertEqual(len(cut_capacities), g.number_of_nodes() - 1)
+        for j in range(g.number_of_nodes() - 1):
+            vs = set(order[:j + 1])
+            self.assertAlmostEqual(cut_capacities[j], graph_util.cut_weight(g.to_undirected(), vs))
+
     def test_cut_from_flow_easy_case(self):
         g = networkx.DiGraph()
         g.add_edge('a', 'b')
@@ -0,0 +1,39 @@
+from __future__ import division
+import sys
+import time
+import tracemalloc
+import graph_util
+import sherman
+from conductance_congestion_approx import ConductanceCongestionApprox
+
+if len(sys.argv) != 4:
+    print('usage: {} <mesh width> <epsilon> <num steps>'.format(sys.argv[0]))
+    sys.exit(1)
+
+width = int(sys.argv[1])
+epsilon = float(sys.argv[2])
+n_steps = int(sys.argv[3])
+print('{} gradient steps on a {}x{} mesh\n'.format(n_steps, width, width))
+
+g = graph_util.gen_rand_2d_mesh(width, width)
+print('n:', g.number_of_nodes())
+print('m:', g.number_of_edges())
+cong_approx = ConductanceCongestionApprox(g)
+sherman_flow = sherman.ShermanFlow(g, cong_approx)
+# Warm up (and let lazily built structures be built) before measuring.
+sherman_flow.max_st_flow(0, width * width - 1, epsilon, max_iters=1)
+
+start_time = time.time()
+sherman_flow.max_st_flow(0, width * width - 1, epsilon, max_iters=n_steps)
+stop_time = time.time()
+steps = sum(state.steps for state in sherman_flow.route_states)
+
+tracemalloc.start()
+sherman_flow.max_st_flow(0, width * width - 1, epsilon, max_iters=n_steps)
+_, peak_bytes = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+
+print('steps:', steps)
+print('time per step:', (stop_time - start_time) / steps)
+print('peak traced memory (MB):', peak_bytes / 2**20)
+sys.exit(0)
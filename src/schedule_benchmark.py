@@ -0,0 +1,44 @@
+from __future__ import division
+import networkx as nx
+import sys
+import time
+import graph_util
+import sherman
+from conductance_congestion_approx import ConductanceCongestionApprox
+from mst_congestion_approx import MstCongestionApprox
+
+if len(sys.argv) != 5:
+    print('usage: {} <conductance|mst> <mesh width> <complete graph size> <epsilon>'.format(sys.argv[0]))
+    sys.exit(1)
+
+approx_name = sys.argv[1]
+width = int(sys.argv[2])
+n = int(sys.argv[3])
+epsilon = float(sys.argv[4])
+
+if approx_name == 'conductance':
+    make_cong_approx = ConductanceCongestionApprox
+elif approx_name == 'mst':
+    make_cong_approx = lambda g: MstCongestionApprox(g.to_undirected())
+else:
+    print('Unknown congestion approximator: `{}`'.format(approx_name))
+    sys.exit(1)
+
+families = [
+    ('{0}x{0} mesh'.format(width), graph_util.gen_rand_2d_mesh(width, width), 0, width * width - 1),
+    ('{}-complete graph'.format(n), graph_util.complete_graph(n), 0, 1),
+]
+
+for name, g, source, sink in families:
+    print('{} (n: {}, m: {})'.format(name, g.number_of_nodes(), g.number_of_edges()))
+    print('  networkx flow value: {:.6f}'.format(nx.maximum_flow_value(g.to_undirected(), source, sink)))
+    cong_approx = make_cong_approx(g)
+    for adaptive in [False, True]:
+        sherman_flow = sherman.ShermanFlow(g, cong_approx, adaptive=adaptive)
+        start_time = time.time()
+        _, flow_value = sherman_flow.max_st_flow(source, sink, epsilon)
+        stop_time = time.time()
+        steps = sum(state.steps for state in sherman_flow.route_states)
+        print('  {:8s} flow value: {:.6f}  steps: {:7d}  time: {:.4f}'.format(
+            'adaptive' if adaptive else 'fixed', flow_value, steps, stop_time - start_time))
+sys.exit(0)
@@ -2,16 +2,133 @@ from __future__ import division
 import numpy as np
 import numpy.linalg as la
 import math
+import time
+import scipy.sparse as sp
 import graph_util
-from soft_max import soft_max, grad_soft_max
+from soft_max import soft_max, grad_soft_max, soft_max_and_grad, soft_max_into
+from congestion_approx import scale_rows
 from conductance_congestion_approx import ConductanceCongestionApprox
 
+class RouteState:
+    # The iterate of one almost_route call, kept so that a later solve on
+    # nearby demands or capacities can start from it instead of from f = 0.
+    # flow and prev_flow are unscaled (divided by scaling); iters is the
+    # momentum counter and steps the number of gradient steps the call took.
+    # The call converged once delta (||C grad phi||_1) fell below target; a
+    # call cut short by its SolveBudget reports the smallest delta it saw.
+    def __init__(self, flow, prev_flow, scaling, iters, steps, delta, target):
+        self.flow = flow
+        self.prev_flow = prev_flow
+        self.scaling = scaling
+        self.iters = iters
+        self.steps = steps
+        self.delta = delta
+        self.target = target
+        self.converged = delta < target
+
+
+class SolveBudget:
+    # Gradient-step and wall-clock limits shared by every almost_route round of
+    # one solve. Either limit may be None.
+    def __init__(self, max_iters=None, time_limit=None):
+        self.iters_left = max_iters
+        self.deadline = None if time_limit is None else time.time() + time_limit
+
+    def spend_iter(self):
+        if self.iters_left is not None:
+            self.iters_left -= 1
+
+    def exhausted(self):
+        if self.iters_left is not None and self.iters_left <= 0:
+            return True
+        return self.deadline is not None and time.time() >= self.deadline
+
+
+class GapCertificate:
+    # Primal and dual bounds on the max flow value for one demand vector.
+    # lower_bound is certified by a flow, upper_bound by a cut, so the optimum
+    # lies between them and gap() bounds the relative error of the flow.
+    def __init__(self, demands, tolerance, check_interval=10):
+        self.demands = np.array(demands, dtype=float)
+        self.tolerance = tolerance
+        # How many gradient steps to wait between the (more expensive) flow
+        # lower bound evaluations. The cut upper bound is refreshed each step.
+        self.check_interval = check_interval
+        self.lower_bound = 0.0
+        self.upper_bound = float('inf')
+
+    def gap(self):
+        if self.upper_bound == float('inf'):
+            return float('inf')
+        if self.upper_bound <= 0:
+            return 0.0
+        return (self.upper_bound - self.lower_bound) / self.upper_bound
+
+    def certified(self):
+        return self.gap() <= self.tolerance
+
+
+class IterationWorkspace:
+    # Preallocated buffers for one almost_route iteration, so that the
+    # element-wise work of phi and grad phi does not allocate m-length
+    # temporaries every step. m is the number of edges, n of nodes and r the
+    # length of the congestion approximator's output.
+    def __init__(self, m, n, r):
+        self.m = m
+        self.r = r
+        self.x1 = np.empty(m)
+        self.p1 = np.empty(m)
+        self.scratch_m = np.empty(m)
+        self.grad = np.empty(m)
+        self.direction = np.empty(m)
+        self.resid = np.empty(n)
+        self.p2 = np.empty(r)
+        self.scratch_r = np.empty(r)
+        # Iterates of almost_route, and the best one seen under a budget.
+        self.f = np.empty(m)
+        self.f_prev = np.empty(m)
+        self.y = np.empty(m)
+        self.best = np.empty(m)
+
+
 class ShermanFlow:
-    def __init__(self, g, cong_approx):
+    def __init__(self, g, cong_approx, adaptive=False):
         self.graph = g
         self.cong_approx = cong_approx
-        self.edge_capacities = [1.0 * c for c in graph_util.get_edge_capacities(g)]
-        self.edge_capacities_inv = [1.0 / c for c in graph_util.get_edge_capacities(g)]
+        # The adaptive schedule replaces the fixed step, momentum and
+        # rescaling rules of almost_route (see almost_route).
+        self.adaptive = adaptive
+        self.edge_capacities = np.array(graph_util.get_edge_capacities(g), dtype=float)
+        self.edge_capacities_inv = 1.0 / self.edge_capacities
+        # One RouteState per almost_route round of the last min_congestion_flow.
+        self.route_states = []
+        # GapCertificate of the last max_flow, if it was asked for one.
+        self.certificate = None
+        # Built on first use, once the length of R's output is known.
+        self.workspace = None
+
+        # B is the node-edge incidence matrix: column i has -1 at the tail and
+        # +1 at the head of the i-th edge of edge_iter(g). It is built once so
+        # that B x and B^T x are sparse matvecs rather than Python loops.
+        n = g.number_of_nodes()
+        m = g.number_of_edges()
+        self.edge_from, self.edge_to = graph_util.edge_index_arrays(g)
+        edge_ids = np.arange(m)
+        self.incidence = sp.csr_matrix(
+            (np.concatenate((-np.ones(m), np.ones(m))),
+             (np.concatenate((self.edge_from, self.edge_to)),
+              np.concatenate((edge_ids, edge_ids)))),
+            shape=(n, m))
+        self.incidence_t = self.incidence.T.tocsr()
+
+    def update_edge_capacities(self, capacities):
+        # Overwrite the capacity arrays in place (capacities in edge_iter
+        # order). The incidence matrix and the congestion approximator are
+        # kept; for small capacity drift the approximator stays a valid, if
+        # slightly looser, approximation. The graph's edge attributes are not
+        # touched.
+        np.copyto(self.edge_capacities, capacities)
+        np.divide(1.0, self.edge_capacities, out=self.edge_capacities_inv)
 
     def compute_R(self, x):
         return np.array(self.cong_approx.compute_dot(x))
@@ -20,27 +137,16 @@ class ShermanFlow:
         return np.array(self.cong_approx.compute_transpose_dot(x))
 
     def compute_C(self, x):
-        return np.multiply(x, self.edge_capacities)
+        return scale_rows(x, self.edge_capacities)
 
     def compute_Cinv(self, x):
-        return np.multiply(x, self.edge_capacities_inv)
+        return scale_rows(x, self.edge_capacities_inv)
 
     def compute_B(self, x):
-        excess = np.zeros(self.graph.number_of_nodes())
-        edge_i = 0
-        for edge_from, edge_to in graph_util.edge_iter(self.graph):
-            excess[edge_from] -= x[edge_i]
-            excess[edge_to] += x[edge_i]
-            edge_i += 1
-        return excess
+        return self.incidence.dot(x)
 
     def compute_BT(self, x):
-        potentials = np.zeros(self.graph.number_of_edges())
-        edge_i = 0
-        for edge_from, edge_to in graph_util.edge_iter(self.graph):
-            potentials[edge_i] = -x[edge_from] + x[edge_to]
-            edge_i += 1
-        return potentials
+        return self.incidence_t.dot(x)
 
     def phi(self, f, b):
         alpha = self.cong_approx.alpha()
@@ -49,6 +155,11 @@ class ShermanFlow:
             2 * alpha * self.compute_R(resid))
 
     def grad_phi(self, f, b):
+        return self.grad_phi_with_potentials(f, b)[0]
+
+    def grad_phi_with_potentials(self, f, b):
+        # Also returns the node potentials R^T p2 of the soft-max dual, whose
+        # threshold cuts give the upper bound of a GapCertificate.
         x1 = self.compute_Cinv(f)
         p1 = grad_soft_max(x1)
 
@@ -57,10 +168,121 @@ class ShermanFlow:
         x2 = 2 * alpha * self.compute_R(resid)
         p2 = grad_soft_max(x2)
 
+        potentials = self.compute_RT(p2)
         return self.compute_Cinv(p1) - 2 * alpha * (
-            self.compute_BT(self.compute_RT(p2)))
+            self.compute_BT(potentials)), potentials
+
+    def get_workspace(self, r):
+        m = self.graph.number_of_edges()
+        if self.workspace is None or self.workspace.r != r:
+            self.workspace = IterationWorkspace(m, self.graph.number_of_nodes(), r)
+        return self.workspace
+
+    def phi_into(self, f, b, ws):
+        # phi(f, b) for 1-D f and b, using the buffers of an IterationWorkspace.
+        np.multiply(f, self.edge_capacities_inv, out=ws.x1)
+        np.subtract(b, self.compute_B(f), out=ws.resid)
+        x2 = self.compute_R(ws.resid)
+        x2 *= 2 * self.cong_approx.alpha()
+        return soft_max_into(ws.x1, ws.scratch_m) + soft_max_into(x2, ws.scratch_r)
+
+    def grad_phi_into(self, f, b, ws):
+        # grad_phi_with_potentials for 1-D f and b. The gradient is written to
+        # ws.grad, which the next call overwrites.
+        alpha = self.cong_approx.alpha()
+        np.multiply(f, self.edge_capacities_inv, out=ws.x1)
+        soft_max_and_grad(ws.x1, ws.p1, ws.scratch_m)
+
+        np.subtract(b, self.compute_B(f), out=ws.resid)
+        x2 = self.compute_R(ws.resid)
+        x2 *= 2 * alpha
+        soft_max_and_grad(x2, ws.p2, ws.scratch_r)
+
+        potentials = self.compute_RT(ws.p2)
+        BT_potentials = self.compute_BT(potentials)
+        BT_potentials *= 2 * alpha
+        np.multiply(ws.p1, self.edge_capacities_inv, out=ws.grad)
+        ws.grad -= BT_potentials
+        return ws.grad, potentials
+
+    def cut_upper_bound(self, potentials, demands):
+        # Every cut S bounds the max flow value by
+        #   sum(b+) * cap(S) / |b(S)|,
+        # so the best threshold cut of the potentials gives an upper bound.
+        order, cut_capacities = graph_util.sweep_cuts(
+            potentials, self.edge_from, self.edge_to, self.edge_capacities)
+        side_demands = np.abs(np.cumsum(demands[order])[:-1])
+        separating = side_demands > 1e-12 * np.sum(np.abs(demands))
+        if not separating.any():
+            return float('inf')
+        ratios = cut_capacities[separating] / side_demands[separating]
+        return np.min(ratios) * np.sum(np.maximum(demands, 0))
+
+    def flow_lower_bound(self, flow, demands):
+        # Scale flow to congestion 1 and write what it routes as
+        # lam * demands + residual. The congestion approximator routes the
+        # residual with congestion at most alpha * ||R residual||_inf, so
+        # lam / (1 + alpha * ||R residual||_inf) times demands is routable
+        # within capacity and gives a lower bound on the max flow value.
+        max_edge_congestion = la.norm(self.compute_Cinv(flow), np.inf)
+        if max_edge_congestion == 0:
+            return 0.0
+        routed = self.compute_B(flow) / max_edge_congestion
+        lam = np.dot(routed, demands) / np.dot(demands, demands)
+        residual_congestion = self.cong_approx.alpha() * la.norm(
+            self.compute_R(routed - lam * demands), np.inf)
+        return max(lam, 0) / (1 + residual_congestion) * np.sum(np.maximum(demands, 0))
+
+    def rescale_factor(self, f, b, target, growth):
+        # Closed-form replacement for multiplying (f, b) by growth until
+        # phi(f, b) >= target. phi(t f, t b) = lmax(t x1) + lmax(t x2) with x1
+        # and x2 computed once. lmax(t x) >= t ||x||_inf, and by convexity
+        # lmax(t x) >= t lmax(x) - (t - 1) lmax(0) for t >= 1, so the smallest
+        # power of growth past either bound is enough.
+        alpha = self.cong_approx.alpha()
+        x2 = self.compute_R(b - self.compute_B(f))
+        x2 *= 2 * alpha
+        ws = self.get_workspace(len(x2))
+        x1 = np.multiply(f, self.edge_capacities_inv, out=ws.x1)
+        phi_f = soft_max_into(x1, ws.scratch_m) + soft_max_into(x2, ws.scratch_r)
+        if phi_f >= target:
+            return 1
+        lmax_zero = math.log(2 * len(x1)) + math.log(2 * len(x2))
+        norm_sum = la.norm(x1, np.inf) + la.norm(x2, np.inf)
+        t = float('inf')
+        if norm_sum > 0:
+            t = target / norm_sum
+        if phi_f > lmax_zero:
+            t = min(t, (target - lmax_zero) / (phi_f - lmax_zero))
+        factor = growth ** max(1, math.ceil(math.log(t) / math.log(growth)))
+        # Only guards against rounding; the bounds above already suffice.
+        while soft_max(factor * x1) + soft_max(factor * x2) < target:
+            factor *= growth
+        return factor
 
-    def almost_route(self, demands, epsilon):
+    def almost_route(self, demands, epsilon, warm_start=None, budget=None,
+                     certificate=None, base_flow=0):
+        # warm_start is an optional RouteState from an earlier solve. Its flow
+        # and momentum seed the iteration, and its scaling is used whenever it
+        # is above the cold-start scaling, which skips the rescaling steps the
+        # earlier solve already went through.
+        #
+        # If the optional SolveBudget runs out first, the iterate with the
+        # smallest delta seen so far is returned instead of a converged one.
+        #
+        # An optional GapCertificate for the original demands is tightened as
+        # the iteration runs, taking base_flow + f as the candidate flow (later
+        # rounds of min_congestion_flow route residuals on top of base_flow).
+        # The call returns early once the certificate's gap is small enough.
+        #
+        # In adaptive mode (self.adaptive) three rules change:
+        #   - rescaling jumps straight to the needed power of (k1 + 1) / k1
+        #     (rescale_factor) instead of testing one power at a time;
+        #   - the step length starts at up to max_step_scale times the fixed
+        #     step and is halved until phi decreases by half the first-order
+        #     estimate; the fixed step always satisfies that test;
+        #   - momentum restarts whenever the gradient at y points along the
+        #     last step (grad . (f - f_prev) > 0).
         n = self.graph.number_of_nodes()
         m = self.graph.number_of_edges()
 
@@ -71,55 +293,244 @@ class ShermanFlow:
         k2 = 2 / 7
 
         scaling = 1
-        f = np.zeros(m)
-        y = np.array(f)
-        b = np.array(demands)
-        norm_Rb = la.norm(self.compute_R(b), np.inf)
+        b = np.array(demands, dtype=float)
+        Rb = self.compute_R(b)
+        norm_Rb = la.norm(Rb, np.inf)
         alpha = self.cong_approx.alpha()
         scaling *= abs(k1 * math.log(n) / (2 * alpha * norm_Rb))
-        b = b * scaling
         iters = 1
+        # f, y and f_prev live in the workspace and are updated in place;
+        # f and f_prev swap buffers each step.
+        ws = self.get_workspace(len(Rb))
+        f, y, f_prev = ws.f, ws.y, ws.f_prev
+        if warm_start is not None:
+            scaling = max(scaling, warm_start.scaling)
+            iters = warm_start.iters
+            np.multiply(warm_start.flow, scaling, out=f)
+            np.multiply(warm_start.prev_flow, scaling, out=f_prev)
+            np.subtract(f, f_prev, out=y)
+            y *= (iters - 1) / (iters + 2)
+            y += f
+        else:
+            f.fill(0)
+            f_prev.fill(0)
+            y.fill(0)
+        b *= scaling
+        steps = 0
+        best_delta = float('inf')
+        max_step_scale = 64
+        step_scale = max_step_scale
 
         while True:
-            while self.phi(f, b) < k1 * math.log(n):
-                f = (k1 + 1) / k1 * f
-                y = (k1 + 1) / k1 * y
-                b = (k1 + 1) / k1 * b
+            if self.adaptive:
+                growth = self.rescale_factor(f, b, k1 * math.log(n), (k1 + 1) / k1)
+                if growth != 1:
+                    f *= growth
+                    y *= growth
+                    b *= growth
+                    scaling *= growth
+            while not self.adaptive and self.phi_into(f, b, ws) < k1 * math.log(n):
+                f *= (k1 + 1) / k1
+                y *= (k1 + 1) / k1
+                b *= (k1 + 1) / k1
                 scaling *= (k1 + 1) / k1
 
-            grad_phi_y = self.grad_phi(y, b)
-            delta = la.norm(self.compute_C(grad_phi_y), 1)
+            grad_phi_y, potentials = self.grad_phi_into(y, b, ws)
+            np.multiply(grad_phi_y, self.edge_capacities, out=ws.scratch_m)
+            np.abs(ws.scratch_m, out=ws.scratch_m)
+            delta = ws.scratch_m.sum()
+            if certificate is not None:
+                certificate.upper_bound = min(certificate.upper_bound, self.cut_upper_bound(
+                    potentials, certificate.demands))
+                if steps % certificate.check_interval == 0:
+                    certificate.lower_bound = self.flow_lower_bound(
+                        base_flow + f / scaling, certificate.demands)
+                    if certificate.certified():
+                        self.route_states.append(RouteState(
+                            f / scaling, f_prev / scaling, scaling, iters,
+                            steps, delta, k2 * epsilon))
+                        return f / scaling
             if delta >= k2 * epsilon:
-                f_prev = np.array(f)
-                f = y - delta / (1 + 4 * alpha**2) * self.compute_C(
-                    np.sign(grad_phi_y))
-                y = f + (iters - 1) / (iters + 2) * (f - f_prev)
+                if budget is not None:
+                    if delta < best_delta:
+                        best_delta = delta
+                        np.divide(y, scaling, out=ws.best)
+                    if budget.exhausted():
+                        best_flow = np.array(ws.best)
+                        self.route_states.append(RouteState(
+                            best_flow, f_prev / scaling, scaling, iters,
+                            steps, best_delta, k2 * epsilon))
+                        return best_flow
+                f, f_prev = f_prev, f
+                step = delta / (1 + 4 * alpha**2)
+                np.sign(grad_phi_y, out=ws.direction)
+                ws.direction *= self.edge_capacities
+                if self.adaptive:
+                    phi_y = self.phi_into(y, b, ws)
+                    while step_scale > 1:
+                        np.multiply(ws.direction, step_scale * step, out=f)
+                        np.subtract(y, f, out=f)
+                        if self.phi_into(f, b, ws) <= phi_y - step_scale * step * delta / 2:
+                            break
+                        step_scale /= 2
+                    step *= step_scale
+                    step_scale = min(2 * step_scale, max_step_scale)
+                np.multiply(ws.direction, step, out=f)
+                np.subtract(y, f, out=f)
+                np.subtract(f, f_prev, out=ws.scratch_m)
+                if self.adaptive and np.dot(grad_phi_y, ws.scratch_m) > 0:
+                    iters = 1
+                np.multiply(ws.scratch_m, (iters - 1) / (iters + 2), out=y)
+                y += f
                 iters += 1
+                steps += 1
+                if budget is not None:
+                    budget.spend_iter()
             else:
+                self.route_states.append(RouteState(
+                    f / scaling, f_prev / scaling, scaling, iters,
+                    steps, delta, k2 * epsilon))
                 return f / scaling
 
-    def min_congestion_flow(self, demands, epsilon):
+    def min_congestion_flow(self, demands, epsilon, warm_start=None, budget=None,
+                            certificate=None):
+        # Only the first round, which routes the bulk of the demands, is
+        # warm-started: later rounds route small residuals that need not
+        # resemble those of the earlier solve. Once the budget is spent or the
+        # certificate's gap is small enough the remaining rounds are skipped.
         n = self.graph.number_of_nodes()
         m = self.graph.number_of_edges()
         f_total = np.zeros(m)
+        self.route_states = []
         for i in range(int(math.log(2 * m))):
-            f = self.almost_route(demands, epsilon)
+            if i > 0 and budget is not None and budget.exhausted():
+                break
+            if i > 0 and certificate is not None and certificate.certified():
+                break
+            f = self.almost_route(
+                demands, epsilon, warm_start if i == 0 else None, budget,
+                certificate, f_total)
             demands = demands - self.compute_B(f)
             epsilon = 0.5
             f_total += f
+            if certificate is not None:
+                certificate.lower_bound = max(certificate.lower_bound,
+                                              self.flow_lower_bound(f_total, certificate.demands))
         return f_total
 
-    def max_flow(self, demands, epsilon):
-        flow = self.min_congestion_flow(demands, epsilon)
+    def max_flow(self, demands, epsilon, warm_start=None, max_iters=None,
+                 time_limit=None, gap_tolerance=None):
+        # To re-solve after a small change in demands or capacities, pass
+        # warm_start=sherman_flow.route_states[0] from the previous solve.
+        #
+        # max_iters (gradient steps) and time_limit (seconds) bound the whole
+        # solve. When either runs out, the best flow found so far is scaled to
+        # be feasible and returned; self.converged() then is False and
+        # self.route_states[-1].delta / .target says how far the cut-short
+        # round was from the convergence criterion.
+        #
+        # With gap_tolerance set, a GapCertificate is kept alongside the solve
+        # and the solve stops as soon as the relative gap between its flow and
+        # cut bounds is within gap_tolerance. The certificate, with the gap
+        # certified for the returned flow, is left in self.certificate.
+        budget = None
+        if max_iters is not None or time_limit is not None:
+            budget = SolveBudget(max_iters, time_limit)
+        self.certificate = None
+        if gap_tolerance is not None:
+            self.certificate = GapCertificate(demands, gap_tolerance)
+        flow = self.min_congestion_flow(
+            demands, epsilon, warm_start, budget, self.certificate)
         max_edge_congestion = la.norm(self.compute_Cinv(flow), np.inf)
-        max_flow = flow / max_edge_congestion
+        # A budget can run out before the first step, leaving the zero flow.
+        max_flow = flow / max_edge_congestion if max_edge_congestion > 0 else flow
         max_flow_value = 0
         sink_nodes = np.maximum(np.sign(demands), np.zeros(len(demands)))
         max_flow_value = np.dot(self.compute_B(max_flow), sink_nodes)
         return max_flow, max_flow_value
 
-    def max_st_flow(self, source_i, sink_i, epsilon):
+    # The *_batch variants solve k demand vectors at once. demands is a
+    # (k x n) matrix with one demand vector per row; internally the vectors
+    # are the columns of (n x k) and (m x k) arrays so that B, C and R are
+    # applied to the whole batch with one matrix-matrix product.
+
+    def almost_route_batch(self, demands, epsilon):
+        n = self.graph.number_of_nodes()
+        m = self.graph.number_of_edges()
+
+        k1 = 7 / 2 / epsilon
+        k2 = 2 / 7
+
+        b = np.array(demands, dtype=float).T
+        alpha = self.cong_approx.alpha()
+        norm_Rb = np.max(np.abs(self.compute_R(b)), axis=0)
+        scaling = np.abs(k1 * math.log(n) / (2 * alpha * norm_Rb))
+        b = b * scaling
+        f = np.zeros((m, b.shape[1]))
+        y = np.array(f)
+        routed = np.zeros((m, b.shape[1]))
+        # Columns of f, y, b and scaling that are still iterating, as indices
+        # into the batch. Converged columns are written to routed and dropped.
+        active = np.arange(b.shape[1])
+        iters = 1
+
+        while active.size:
+            while True:
+                low = self.phi(f, b) < k1 * math.log(n)
+                if not low.any():
+                    break
+                growth = np.where(low, (k1 + 1) / k1, 1.0)
+                f = f * growth
+                y = y * growth
+                b = b * growth
+                scaling *= growth
+
+            grad_phi_y = self.grad_phi(y, b)
+            delta = np.sum(np.abs(self.compute_C(grad_phi_y)), axis=0)
+            done = delta < k2 * epsilon
+            if done.any():
+                routed[:, active[done]] = f[:, done] / scaling[done]
+                keep = ~done
+                active = active[keep]
+                f, y, b = f[:, keep], y[:, keep], b[:, keep]
+                grad_phi_y, delta, scaling = grad_phi_y[:, keep], delta[keep], scaling[keep]
+            f_prev = f
+            f = y - delta / (1 + 4 * alpha**2) * self.compute_C(
+                np.sign(grad_phi_y))
+            y = f + (iters - 1) / (iters + 2) * (f - f_prev)
+            iters += 1
+        return routed.T
+
+    def min_congestion_flow_batch(self, demands, epsilon):
+        m = self.graph.number_of_edges()
+        demands = np.array(demands, dtype=float)
+        f_total = np.zeros((demands.shape[0], m))
+        for i in range(int(math.log(2 * m))):
+            f = self.almost_route_batch(demands, epsilon)
+            demands = demands - self.compute_B(f.T).T
+            epsilon = 0.5
+            f_total += f
+        return f_total
+
+    def max_flow_batch(self, demands, epsilon):
+        demands = np.array(demands, dtype=float)
+        flows = self.min_congestion_flow_batch(demands, epsilon)
+        max_edge_congestion = np.max(np.abs(self.compute_Cinv(flows.T)), axis=0)
+        max_flows = flows / max_edge_congestion[:, np.newaxis]
+        sink_nodes = np.maximum(np.sign(demands), 0)
+        max_flow_values = np.sum(self.compute_B(max_flows.T).T * sink_nodes, axis=1)
+        return max_flows, max_flow_values
+
+    def max_st_flow(self, source_i, sink_i, epsilon, warm_start=None,
+                    max_iters=None, time_limit=None, gap_tolerance=None):
         demands = np.zeros(self.graph.number_of_nodes())
         demands[source_i] = -1
         demands[sink_i] = 1
-        return self.max_flow(demands, epsilon)
+        return self.max_flow(demands, epsilon, warm_start, max_iters, time_limit,
+                             gap_tolerance)
+
+    def converged(self):
+        # Whether the last min_congestion_flow ran every round to convergence.
+        m = self.graph.number_of_edges()
+        return (len(self.route_states) == int(math.log(2 * m)) and
+                all(state.converged for state in self.route_states))
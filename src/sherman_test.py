@@ -58,6 +58,22 @@ class ShermanTest(unittest.TestCase):
         actual_BT = sherman_flow.compute_BT(b)
         npt.assert_array_equal(expected_BT, actual_BT)
 
+    def test_compute_B_matches_edge_order(self):
+        g = graph_util.diluted_complete_graph(12, 0.6)
+        congestion_approximator = ConductanceCongestionApprox(g)
+        sherman_flow = sherman.ShermanFlow(g, congestion_approximator)
+
+        x = np.random.normal(size=g.number_of_edges())
+        b = np.random.normal(size=g.number_of_nodes())
+        expected_Bx = np.zeros(g.number_of_nodes())
+        expected_BTb = np.zeros(g.number_of_edges())
+        for i, (u, v) in enumerate(graph_util.edge_iter(g)):
+            expected_Bx[u] -= x[i]
+            expected_Bx[v] += x[i]
+            expected_BTb[i] = b[v] - b[u]
+        npt.assert_allclose(expected_Bx, sherman_flow.compute_B(x))
+        npt.assert_allclose(expected_BTb, sherman_flow.compute_BT(b))
+
     def test_compute_R(self):
         g = graph_util.complete_graph(5)
         congestion_approximator = ConductanceCongestionApprox(g)
@@ -98,5 +114,127 @@ class ShermanTest(unittest.TestCase):
             self.assertGreaterEqual(flow_value, (1.0 - epsilon) * actual_flow_value)
             self.assertLessEqual(flow_value, (1.0 + epsilon) * actual_flow_value)
 
+    def test_max_flow_batch(self):
+        epsilon = 0.1
+        g = graph_util.diluted_complete_graph(10, 0.8)
+        n = g.number_of_nodes()
+        st_pairs = [(0, 1), (2, 3), (4, 9), (5, 6)]
+        demands = np.zeros((len(st_pairs), n))
+        for i, (s, t) in enumerate(st_pairs):
+            demands[i, s] = -1
+            demands[i, t] = 1
+        cong_approx = ConductanceCongestionApprox(g)
+        sherman_flow = sherman.ShermanFlow(g, cong_approx)
+        flows, flow_values = sherman_flow.max_flow_batch(demands, epsilon)
+        self.assertEqual(flows.shape, (len(st_pairs), g.number_of_edges()))
+        for i, (s, t) in enumerate(st_pairs):
+            actual_flow_value, _ = nx.maximum_flow(g.to_undirected(), s, t)
+            self.assertGreaterEqual(flow_values[i], (1.0 - epsilon) * actual_flow_value)
+            self.assertLessEqual(flow_values[i], (1.0 + epsilon) * actual_flow_value)
+
+    def test_update_edge_capacities(self):
+        g = graph_util.complete_graph(5)
+        congestion_approximator = ConductanceCongestionApprox(g)
+        sherman_flow = sherman.ShermanFlow(g, congestion_approximator)
+        capacities = sherman_flow.edge_capacities
+        capacities_inv = sherman_flow.edge_capacities_inv
+
+        new_capacities = np.arange(1, g.number_of_edges() + 1, dtype=float)
+        sherman_flow.update_edge_capacities(new_capacities)
+        self.assertIs(capacities, sherman_flow.edge_capacities)
+        self.assertIs(capacities_inv, sherman_flow.edge_capacities_inv)
+        x = np.ones(g.number_of_edges())
+        npt.assert_array_equal(new_capacities, sherman_flow.compute_C(x))
+        npt.assert_allclose(1 / new_capacities, sherman_flow.compute_Cinv(x))
+
+    def test_max_flow_warm_start(self):
+        epsilon = 0.1
+        g = graph_util.complete_graph(10)
+        cong_approx = ConductanceCongestionApprox(g)
+        sherman_flow = sherman.ShermanFlow(g, cong_approx)
+        sherman_flow.max_st_flow(0, 1, epsilon)
+        cold_state = sherman_flow.route_states[0]
+        self.assertGreater(cold_state.steps, 0)
+
+        # Re-solving the same problem from its own converged state needs no
+        # further steps in the warm-started round.
+        sherman_flow.max_st_flow(0, 1, epsilon, cold_state)
+        self.assertEqual(sherman_flow.route_states[0].steps, 0)
+
+        capacities = np.random.uniform(0.95, 1.05, g.number_of_edges())
+        sherman_flow.update_edge_capacities(capacities)
+        _, flow_value = sherman_flow.max_st_flow(0, 1, epsilon, cold_state)
+
+        h = nx.Graph()
+        for (u, v), c in zip(graph_util.edge_iter(g), capacities):
+            h.add_edge(u, v, capacity=c)
+        actual_flow_value = nx.maximum_flow_value(h, 0, 1)
+        self.assertGreaterEqual(flow_value, (1.0 - epsilon) * actual_flow_value)
+        self.assertLessEqual(flow_value, (1.0 + epsilon) * actual_flow_value)
+
+    def test_max_flow_budget(self):
+        epsilon = 0.1
+        g = graph_util.complete_graph(10)
+        cong_approx = ConductanceCongestionApprox(g)
+        sherman_flow = sherman.ShermanFlow(g, cong_approx)
+
+        sherman_flow.max_st_flow(0, 1, epsilon)
+        self.assertTrue(sherman_flow.converged())
+        full_steps = sum(state.steps for state in sherman_flow.route_states)
+
+        for max_iters, time_limit in [(5, None), (None, 0.0)]:
+            flow, flow_value = sherman_flow.max_st_flow(
+                0, 1, epsilon, max_iters=max_iters, time_limit=time_limit)
+            self.assertFalse(sherman_flow.converged())
+            last_state = sherman_flow.route_states[-1]
+            self.assertGreaterEqual(last_state.delta, last_state.target)
+            self.assertLess(sum(state.steps for state in sherman_flow.route_states), full_steps)
+            self.assertLessEqual(np.max(np.abs(sherman_flow.compute_Cinv(flow))), 1 + 1e-9)
+            self.assertGreaterEqual(flow_value, 0)
+
+    def test_max_flow_gap_certificate(self):
+        epsilon = 0.05
+        gap_tolerance = 0.1
+        for _ in range(10):
+            g = graph_util.diluted_complete_graph(20, 0.5)
+            if not g.has_edge(0, 1):
+                g.add_edge(0, 1, capacity=1)
+            cong_approx = ConductanceCongestionApprox(g)
+            sherman_flow = sherman.ShermanFlow(g, cong_approx)
+            _, flow_value = sherman_flow.max_st_flow(0, 1, epsilon, gap_tolerance=gap_tolerance)
+            certificate = sherman_flow.certificate
+            actual_flow_value, _ = nx.maximum_flow(g.to_undirected(), 0, 1)
+            self.assertLessEqual(certificate.gap(), gap_tolerance)
+            self.assertLessEqual(certificate.lower_bound, actual_flow_value + 1e-9)
+            self.assertGreaterEqual(certificate.upper_bound, actual_flow_value - 1e-9)
+            self.assertGreaterEqual(flow_value, (1.0 - gap_tolerance) * actual_flow_value)
+
+    def test_max_flow_adaptive(self):
+        epsilon = 0.1
+        for p in [0.7, 1.0]:
+            for _ in range(20):
+                g = graph_util.diluted_complete_graph(10, p)
+                if not g.has_edge(0, 1):
+                    g.add_edge(0, 1, capacity=1)
+                cong_approx = ConductanceCongestionApprox(g)
+                sherman_flow = sherman.ShermanFlow(g, cong_approx, adaptive=True)
+                _, flow_value = sherman_flow.max_st_flow(0, 1, epsilon)
+                actual_flow_value, _ = nx.maximum_flow(g.to_undirected(), 0, 1)
+                self.assertGreaterEqual(flow_value, (1.0 - epsilon) * actual_flow_value)
+                self.assertLessEqual(flow_value, (1.0 + epsilon) * actual_flow_value)
+
+    def test_rescale_factor(self):
+        g = graph_util.diluted_complete_graph(15, 0.6)
+        cong_approx = ConductanceCongestionApprox(g)
+        sherman_flow = sherman.ShermanFlow(g, cong_approx)
+        growth = 1.1
+        for target in [10.0, 50.0, 200.0]:
+            f = 0.01 * np.random.normal(size=g.number_of_edges())
+            b = 0.01 * np.random.normal(size=g.number_of_nodes())
+            factor = sherman_flow.rescale_factor(f, b, target, growth)
+            self.assertGreaterEqual(sherman_flow.phi(factor * f, factor * b), target - 1e-9)
+            power = round(np.log(factor) / np.log(growth))
+            self.assertAlmostEqual(factor, growth ** power)
+
 if __name__ == '__main__':
     unittest.main()
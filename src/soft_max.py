@@ -1,13 +1,47 @@
 from __future__ import division
 import numpy as np
-import math
+
+# All functions reduce over the first axis, so a 2-D x is treated as a batch
+# of column vectors. Exponentials are shifted by max |x| (log-sum-exp), so
+# they never overflow however large the k1 * log(n) scaling makes x.
+
+def max_abs(x):
+    return np.maximum(np.max(x, axis=0), -np.min(x, axis=0))
 
 def soft_max(x):
-    summation = np.sum(np.exp(x) + np.exp(-x))
-    return math.log(summation)
+    shift = max_abs(x)
+    summation = np.sum(np.exp(x - shift) + np.exp(-x - shift), axis=0)
+    return shift + np.log(summation)
 
 def grad_soft_max(x):
-    ex = np.exp(x)
-    emx = np.exp(-x)
-    summation = np.sum(ex + emx)
+    shift = max_abs(x)
+    ex = np.exp(x - shift)
+    emx = np.exp(-x - shift)
+    summation = np.sum(ex + emx, axis=0)
     return (ex - emx) / summation
+
+def soft_max_and_grad(x, grad_out, scratch):
+    # Fused soft_max and grad_soft_max for a 1-D x. The gradient is written to
+    # grad_out; scratch is a buffer of the same shape. Nothing is allocated.
+    shift = max(x.max(), -x.min())
+    np.subtract(x, shift, out=grad_out)
+    np.exp(grad_out, out=grad_out)
+    np.add(x, shift, out=scratch)
+    np.negative(scratch, out=scratch)
+    np.exp(scratch, out=scratch)
+    summation = grad_out.sum() + scratch.sum()
+    np.subtract(grad_out, scratch, out=grad_out)
+    grad_out /= summation
+    return shift + np.log(summation)
+
+def soft_max_into(x, scratch):
+    # soft_max for a 1-D x, using scratch (same shape as x) for the
+    # exponentials instead of allocating.
+    shift = max(x.max(), -x.min())
+    np.subtract(x, shift, out=scratch)
+    np.exp(scratch, out=scratch)
+    summation = scratch.sum()
+    np.add(x, shift, out=scratch)
+    np.negative(scratch, out=scratch)
+    np.exp(scratch, out=scratch)
+    return shift + np.log(summation + scratch.sum())
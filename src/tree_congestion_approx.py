@@ -1,4 +1,5 @@
-from congestion_approx import CongestionApprox
+import numpy as np
+from congestion_approx import CongestionApprox, scale_rows
 from graph_util import EDGE_CAPACITY_ATTR
 
 
@@ -6,42 +7,88 @@ class TreeCongestionApprox(CongestionApprox):
     def __init__(self, tree, tree_root, alpha):
         self.tree = tree.copy()
         self.root = tree_root
-        self.cached_dfs_edges = list(self.recursive_dfs_edges(self.root, set(), False))
-        self.cached_dfs_edges_data = list(self.recursive_dfs_edges(self.root, set(), True))
+        self.cached_dfs_edges_data = list(self.iterative_dfs_edges(self.root))
+        self.cached_dfs_edges = [(u, v) for u, v, _ in self.cached_dfs_edges_data]
         self.alpha_upper = alpha
+        self.build_level_arrays()
+
+    def build_level_arrays(self):
+        # Flatten the DFS tree into index arrays so that routing and potentials
+        # are level-by-level vectorized passes instead of dict walks. Node
+        # indices follow self.tree.nodes(), edge indices follow dfs_edges().
+        node_index = {node: i for i, node in enumerate(self.tree.nodes())}
+        self.num_nodes = len(node_index)
+        num_edges = len(self.cached_dfs_edges_data)
+        self.parent = np.empty(num_edges, dtype=np.intp)
+        self.child = np.empty(num_edges, dtype=np.intp)
+        node_depth = np.zeros(self.num_nodes, dtype=np.intp)
+        edge_depth = np.empty(num_edges, dtype=np.intp)
+        for i, (u, v, _) in enumerate(self.cached_dfs_edges_data):
+            self.parent[i] = node_index[u]
+            self.child[i] = node_index[v]
+            # DFS order visits parents before children.
+            node_depth[self.child[i]] = node_depth[self.parent[i]] + 1
+            edge_depth[i] = node_depth[self.child[i]]
+        # Capacities are only read once R is first applied.
+        self.edge_scale = None
+
+        # Edges of one depth never share a child, so gathers and writes by
+        # child are conflict-free. Several edges of one depth can share a
+        # parent, so each level is sorted by parent and summed with reduceat.
+        self.levels = []
+        if num_edges == 0:
+            return
+        by_depth = np.argsort(edge_depth, kind='stable')
+        depth_starts = np.flatnonzero(np.diff(edge_depth[by_depth])) + 1
+        for edges in np.split(by_depth, depth_starts):
+            edges = edges[np.argsort(self.parent[edges], kind='stable')]
+            parents = self.parent[edges]
+            group_starts = np.flatnonzero(
+                np.concatenate(([True], parents[1:] != parents[:-1])))
+            self.levels.append((edges, self.child[edges], parents,
+                                group_starts, parents[group_starts]))
+
+    def build_capacity_arrays(self):
+        self.inv_capacity = np.array(
+            [1.0 / edict[EDGE_CAPACITY_ATTR] for _, _, edict in self.cached_dfs_edges_data])
+        self.edge_scale = self.inv_capacity / self.alpha()
 
     def route_flow(self, demands):
-        node_flow = dict(zip(self.tree.nodes(), demands))
-        edge_flow = {}
-        for parent, child in reversed(self.dfs_edges()):
-            child_flow = node_flow[child]
-            node_flow[parent] += child_flow
-            edge_flow[(parent, child)] = child_flow
+        # Returns the flow on each tree edge (in dfs_edges() order) when every
+        # node's demand is routed up to the root. demands may hold one demand
+        # vector per column.
+        node_flow = np.array(demands, dtype=float)
+        edge_flow = np.empty((len(self.cached_dfs_edges),) + node_flow.shape[1:])
+        for edges, children, _, group_starts, group_parents in reversed(self.levels):
+            child_flow = node_flow[children]
+            edge_flow[edges] = child_flow
+            node_flow[group_parents] += np.add.reduceat(child_flow, group_starts)
         return edge_flow
 
     def compute_node_potentials(self, edge_potentials):
-        node_potentials = {self.root: 0}
-        for edge, potential in zip(self.dfs_edges(), edge_potentials):
-            parent, child = edge
-            node_potentials[child] = node_potentials[parent] + potential
+        # Returns node potentials (in self.tree.nodes() order) relative to the
+        # root, given potential differences along each tree edge.
+        node_potentials = np.zeros((self.num_nodes,) + edge_potentials.shape[1:])
+        for edges, children, parents, _, _ in self.levels:
+            node_potentials[children] = node_potentials[parents] + edge_potentials[edges]
         return node_potentials
 
-    def recursive_dfs_edges(self, cur_node, visited, data):
-        if cur_node in visited:
-            return
-        visited.add(cur_node)
-        if data:
-            for neighbor, edict in self.tree[cur_node].items():
+    def iterative_dfs_edges(self, root):
+        # Same order as a recursive DFS over self.tree, without the recursion
+        # limit on long paths.
+        visited = {root}
+        stack = [(root, iter(self.tree[root].items()))]
+        while stack:
+            cur_node, neighbors = stack[-1]
+            for neighbor, edict in neighbors:
                 if neighbor in visited:
                     continue
+                visited.add(neighbor)
                 yield (cur_node, neighbor, edict)
-                yield from self.recursive_dfs_edges(neighbor, visited, data)
-        else:
-            for neighbor in self.tree[cur_node].keys():
-                if neighbor in visited:
-                    continue
-                yield (cur_node, neighbor)
-                yield from self.recursive_dfs_edges(neighbor, visited, data)
+                stack.append((neighbor, iter(self.tree[neighbor].items())))
+                break
+            else:
+                stack.pop()
 
     def dfs_edges(self, data=False):
         if data:
@@ -50,13 +97,14 @@ class TreeCongestionApprox(CongestionApprox):
             return self.cached_dfs_edges
 
     def compute_dot(self, b):
-        flow = self.route_flow(b)
-        return [flow[(u, v)] / edict[EDGE_CAPACITY_ATTR] / self.alpha() for (u, v, edict) in self.dfs_edges(data=True)]
+        if self.edge_scale is None:
+            self.build_capacity_arrays()
+        return scale_rows(self.route_flow(b), self.edge_scale)
 
     def compute_transpose_dot(self, x):
-        edge_potentials = (xi / edict[EDGE_CAPACITY_ATTR] for (xi, (u, v, edict)) in zip(x, self.dfs_edges(data=True)))
-        node_potentials = self.compute_node_potentials(edge_potentials)
-        return [node_potentials[n] / self.alpha() for n in self.tree.nodes()]
+        if self.edge_scale is None:
+            self.build_capacity_arrays()
+        return self.compute_node_potentials(scale_rows(x, self.edge_scale))
 
     def alpha(self):
         return self.alpha_upper
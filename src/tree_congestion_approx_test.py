@@ -78,6 +78,22 @@ class TreeCongestionApproxTest(unittest.TestCase):
             r_e_i_hat = tree_approx.compute_dot(e_i_hat)
             self.assertEqual(r_transpose_x[i], np.dot(r_e_i_hat, x))
 
+    def test_deep_path_tree(self):
+        n = 20000
+        g = nx.path_graph(n)
+        for u, v, edict in g.edges(data=True):
+            edict[EDGE_CAPACITY_ATTR] = 2.0
+        tree_approx = TreeCongestionApprox(g, 0, 1.0)
+
+        b = np.zeros(n)
+        b[0] = -1
+        b[n - 1] = 1
+        Rb = tree_approx.compute_dot(b)
+        np.testing.assert_allclose(Rb, 0.5 * np.ones(n - 1))
+
+        potentials = tree_approx.compute_transpose_dot(np.ones(n - 1))
+        np.testing.assert_allclose(potentials, 0.5 * np.arange(n))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,59 @@
+from __future__ import division
+import numpy as np
+import sys
+import time
+import graph_util
+import sherman
+from conductance_congestion_approx import ConductanceCongestionApprox
+
+if len(sys.argv) != 5:
+    print('usage: {} <num vertices> <epsilon> <num solves> <max relative perturbation>'.format(sys.argv[0]))
+    sys.exit(1)
+
+n = int(sys.argv[1])
+epsilon = float(sys.argv[2])
+n_solves = int(sys.argv[3])
+perturbation = float(sys.argv[4])
+print('warm vs. cold re-solves on {}-complete graph, capacities drifting by up to {}\n'.format(n, perturbation))
+
+g = graph_util.complete_graph(n)
+print('n:', n)
+print('m:', g.number_of_edges())
+
+cong_approx = ConductanceCongestionApprox(g)
+sherman_flow = sherman.ShermanFlow(g, cong_approx)
+base_capacities = np.array(sherman_flow.edge_capacities)
+sherman_flow.max_st_flow(0, 1, epsilon)
+
+cold_steps = cold_time = warm_steps = warm_time = 0
+cold_first_steps = warm_first_steps = 0
+for i in range(n_solves):
+    # Each solve sees a bounded drift around the base capacities, so
+    # consecutive problems differ by at most 2 * perturbation.
+    drift = np.random.uniform(1 - perturbation, 1 + perturbation, len(base_capacities))
+    sherman_flow.update_edge_capacities(base_capacities * drift)
+    warm_start = sherman_flow.route_states[0]
+
+    start_time = time.time()
+    _, cold_value = sherman_flow.max_st_flow(0, 1, epsilon)
+    cold_time += time.time() - start_time
+    cold_steps += sum(state.steps for state in sherman_flow.route_states)
+    cold_first_steps += sherman_flow.route_states[0].steps
+
+    start_time = time.time()
+    _, warm_value = sherman_flow.max_st_flow(0, 1, epsilon, warm_start)
+    warm_time += time.time() - start_time
+    warm_steps += sum(state.steps for state in sherman_flow.route_states)
+    warm_first_steps += sherman_flow.route_states[0].steps
+    print('solve {}: cold flow value {:.6f}, warm flow value {:.6f}'.format(i, cold_value, warm_value))
+
+print('================')
+# Only the first almost_route round is warm-started; later rounds route the
+# (small) residual demands from scratch.
+print('cold first-round steps, average:', cold_first_steps / n_solves)
+print('warm first-round steps, average:', warm_first_steps / n_solves)
+print('cold steps, average:', cold_steps / n_solves)
+print('warm steps, average:', warm_steps / n_solves)
+print('cold time, average:', cold_time / n_solves)
+print('warm time, average:', warm_time / n_solves)
+sys.exit(0)